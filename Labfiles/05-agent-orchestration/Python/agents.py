@@ -2,13 +2,17 @@
 # asyncio: enables asynchronous programming to handle concurrent operations
 import asyncio
 import os
-# cast: type hints utility for casting objects to specific types at runtime
-from typing import cast
+import sys
+# textwrap: removes the common indentation from multi-line strings
+import textwrap
+# lru_cache: caches a function's return value so it is only computed once
+from functools import lru_cache
+# Types used to describe coroutines and their results
+from typing import Any, Coroutine, TypeVar
+# AgentRunResponse: the result of one agent run, with its text and messages
+# ChatAgent: an agent created from a chat client with its own instructions
 # ChatMessage: represents individual messages in agent communication
-# Role: enum defining message roles (user, assistant, etc.)
-# SequentialBuilder: orchestrates agents to run in a specific order
-# WorkflowOutputEvent: event fired when workflow produces output data
-from agent_framework import ChatMessage, Role, SequentialBuilder, WorkflowOutputEvent
+from agent_framework import AgentRunResponse, ChatAgent, ChatMessage
 # AzureAIAgentClient: client for interacting with Azure AI Agent Service
 from agent_framework.azure import AzureAIAgentClient
 # AzureCliCredential: authentication using Azure CLI credentials for Azure authentication
@@ -19,52 +23,194 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Visual separator printed between agent outputs
+SEP = "-" * 60
 
-async def main():
-    # Main asynchronous function that orchestrates the multi-agent workflow
-    # This function coordinates three specialized agents to process customer feedback
-    
-    # Define instructions for the summarizer agent
-    # The summarizer reduces raw customer feedback into a single, concise sentence
-    # This condensed format makes feedback easier to process in downstream systems
-    summarizer_instructions="""
+# Result type of the coroutines passed to run_concurrently()
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=None)
+def get_credential() -> AzureCliCredential:
+    # Return the Azure CLI credential shared by every chat client in the process
+    # Reusing one credential avoids spawning a new Azure CLI token request per client
+    return AzureCliCredential()
+
+
+# Define instructions for the summarizer agent
+# The summarizer reduces raw customer feedback into a single, concise sentence
+# This condensed format makes feedback easier to process in downstream systems
+# dedent() and strip() remove indentation and blank lines so they are not sent to the model as tokens
+SUMMARIZER_INSTRUCTIONS = textwrap.dedent("""
     Summarize the customer's feedback in one short sentence. Keep it neutral and concise.
     Example output:
     App crashes during photo upload.
     User praises dark mode feature.
-    """
+""").strip()
 
-    # Define instructions for the classifier agent
-    # The classifier categorizes feedback into one of three predefined categories
-    # This categorization enables targeted routing and prioritization of feedback
-    classifier_instructions="""
+# Define instructions for the classifier agent
+# The classifier categorizes feedback into one of three predefined categories
+# This categorization enables targeted routing and prioritization of feedback
+CLASSIFIER_INSTRUCTIONS = textwrap.dedent("""
     Classify the feedback as one of the following: Positive, Negative, or Feature request.
-    """
+""").strip()
 
-    # Define instructions for the action recommendation agent
-    # The action agent suggests the next step based on the summary and classification
-    # Recommended actions guide what team should handle the feedback and how
-    action_instructions="""
+# Define instructions for the action recommendation agent
+# The action agent suggests the next step based on the summary and classification
+# Recommended actions guide what team should handle the feedback and how
+ACTION_INSTRUCTIONS = textwrap.dedent("""
     Based on the summary and classification, suggest the next action in one short sentence.
     Example output:
     Escalate as a high-priority bug for the mobile team.
     Log as positive feedback to share with design and marketing.
     Log as enhancement request for product backlog.
-    """
+""").strip()
+
+# Sample customer feedback that will be processed through the agent pipeline
+# This feedback describes a positive customer support experience
+SAMPLE_FEEDBACK = textwrap.dedent("""
+    I reached out to your customer support yesterday because I couldn't access my account.
+    The representative responded almost immediately, was polite and professional, and fixed the issue within minutes.
+    Honestly, it was one of the best support experiences I've ever had.
+""").strip()
+
+
+def create_agents(chat_client: AzureAIAgentClient) -> tuple[ChatAgent, ChatAgent, ChatAgent]:
+    # Create the summarizer, classifier and action agents on the given chat client
+    # The agents are created once and can be reused for any number of feedback items
+
+    # Instantiate the summarizer agent with its specific instructions
+    # Each agent is a distinct entity with its own behavior and role in the workflow
+    summarizer = chat_client.create_agent(
+        instructions=SUMMARIZER_INSTRUCTIONS,
+        name="summarizer",
+    )
+
+    # Instantiate the classifier agent with its specific instructions
+    # The classifier categorizes the raw feedback for routing, independently of the summarizer
+    classifier = chat_client.create_agent(
+        instructions=CLASSIFIER_INSTRUCTIONS,
+        name="classifier",
+    )
+
+    # Instantiate the action recommendation agent with its specific instructions
+    # This agent determines the next action to take based on prior analysis
+    action = chat_client.create_agent(
+        instructions=ACTION_INSTRUCTIONS,
+        name="action",
+    )
+
+    return summarizer, classifier, action
+
+
+async def run_concurrently(*coros: Coroutine[Any, Any, T]) -> list[T]:
+    # Run the coroutines concurrently and return their results in the same order
+
+    # The TaskGroup starts every coroutine at once and waits until all have completed
+    # If one fails, the TaskGroup cancels the others instead of leaving them running
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(coro) for coro in coros]
+    except ExceptionGroup as group:
+        # TaskGroup wraps failures in an ExceptionGroup
+        # Re-raise the first underlying error so callers can catch it by its own type,
+        # as they could when the coroutines were run with asyncio.gather()
+        raise group.exceptions[0] from None
+    return [task.result() for task in tasks]
+
+
+async def summarize_and_classify(
+    summarizer: ChatAgent, classifier: ChatAgent, feedback: str
+) -> tuple[AgentRunResponse, AgentRunResponse]:
+    # Run the summarizer and classifier on one feedback item and return both results
+
+    # Run the summarizer and classifier concurrently
+    # Both agents only need the raw feedback, so neither has to wait for the other
+    feedback_msg = f"Customer feedback: {feedback}"
+    summary, classification = await run_concurrently(
+        summarizer.run(feedback_msg),
+        classifier.run(feedback_msg),
+    )
+    return summary, classification
+
+
+async def process_feedback(
+    summarizer: ChatAgent, classifier: ChatAgent, action: ChatAgent, feedback: str
+) -> list[ChatMessage]:
+    # Run one feedback item through the three agents and return every agent message in order
+
+    # Get the summary and classification, which are produced concurrently
+    summary, classification = await summarize_and_classify(summarizer, classifier, feedback)
+
+    # Run the action agent on the combined results
+    # Only the action agent depends on both previous results, so it runs last
+    result = await action.run(f"Summary: {summary.text}\nClassification: {classification.text}")
+
+    return [*summary.messages, *classification.messages, *result.messages]
+
+
+async def run_batch(feedbacks: list[str], max_concurrency: int = 10) -> list[list[ChatMessage]]:
+    # Process many feedback items concurrently and return the messages for each item
+    # Results are returned in the same order as the input feedback
+
+    # Get project endpoint and deployment name from environment variables
+    project_endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT")
+    deployment_name = os.getenv("AZURE_AI_MODEL_DEPLOYMENT_NAME")
+
+    if not project_endpoint or not deployment_name:
+        raise RuntimeError("AZURE_AI_PROJECT_ENDPOINT and AZURE_AI_MODEL_DEPLOYMENT_NAME must be set in .env")
+
+    # With no workers nothing would be processed, and every item would come back empty
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    # Results are written by index so they keep the input order
+    # Only max_concurrency workers exist at any time, however many feedback items there are,
+    # so memory does not grow with one pending task per item
+    results: list[list[ChatMessage]] = [[] for _ in feedbacks]
+    pending = iter(enumerate(feedbacks))
+
+    # A single chat client and a single set of agents are shared by every feedback item
+    async with AzureAIAgentClient(
+        credential=get_credential(),
+        ai_project_endpoint=project_endpoint,
+        ai_model_deployment_name=deployment_name
+    ) as chat_client:
+        summarizer, classifier, action = create_agents(chat_client)
+
+        async def _worker() -> None:
+            # Take the next feedback item until none are left
+            # The workers share one iterator, so each item is processed exactly once
+            for i, feedback in pending:
+                results[i] = await process_feedback(summarizer, classifier, action, feedback)
+
+        # Limit how many feedback items are in flight at once
+        # Each item runs the summarizer and classifier at the same time, so up to
+        # 2 * max_concurrency model calls are in flight; choose max_concurrency so that
+        # stays within the model deployment's rate limits
+        # All workers are awaited, and the others are stopped if one of them fails
+        await run_concurrently(*[_worker() for _ in range(min(max_concurrency, len(feedbacks)))])
+
+    return results
+
+
+async def main():
+    # Main asynchronous function that orchestrates the multi-agent workflow
+    # This function coordinates three specialized agents to process customer feedback
 
     # Create the chat client
-    # Instantiate Azure CLI credentials to authenticate with Azure services
+    # Use the shared Azure CLI credentials to authenticate with Azure services
     # This allows the app to securely access the Azure AI Agent Service
-    credential = AzureCliCredential()
-    
+    credential = get_credential()
+
     # Get project endpoint and deployment name from environment variables
     project_endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT")
     deployment_name = os.getenv("AZURE_AI_MODEL_DEPLOYMENT_NAME")
-    
+
     if not project_endpoint or not deployment_name:
         print("Error: AZURE_AI_PROJECT_ENDPOINT and AZURE_AI_MODEL_DEPLOYMENT_NAME must be set in .env")
         return
-    
+
     # Use async context manager to ensure proper resource cleanup after execution
     # AzureAIAgentClient automatically loads settings from the .env configuration file
     async with (
@@ -75,74 +221,31 @@ async def main():
         ) as chat_client,
     ):
         # Create agents
-        # Instantiate the summarizer agent with its specific instructions
-        # Each agent is a distinct entity with its own behavior and role in the workflow
-        summarizer = chat_client.create_agent(
-            instructions=summarizer_instructions,
-            name="summarizer",
-        )
-
-        # Instantiate the classifier agent with its specific instructions
-        # The classifier categorizes the summarized feedback for routing
-        classifier = chat_client.create_agent(
-            instructions=classifier_instructions,
-            name="classifier",
-        )
-
-        # Instantiate the action recommendation agent with its specific instructions
-        # This agent determines the next action to take based on prior analysis
-        action = chat_client.create_agent(
-            instructions=action_instructions,
-            name="action",
-        )
-
-        # Initialize the current feedback
-        # Sample customer feedback that will be processed through the agent pipeline
-        # This feedback describes a positive customer support experience
-        feedback="""
-        I reached out to your customer support yesterday because I couldn't access my account. 
-        The representative responded almost immediately, was polite and professional, and fixed the issue within minutes. 
-        Honestly, it was one of the best support experiences I've ever had.
-        """
-
-        # Build sequential orchestration
-        # Create a workflow where agents process feedback in a predefined order
-        # Each agent receives the output from previous agents for further analysis
-        # SequentialBuilder ensures agents execute sequentially, not in parallel
-        workflow = SequentialBuilder().participants([summarizer, classifier, action]).build()
-
-        # Run and collect outputs
-        # Initialize list to store all output messages from the workflow execution
-        # Each agent's response will be appended as the workflow progresses
-        outputs: list[list[ChatMessage]] = []
-        # Run the workflow asynchronously with the customer feedback as input
-        # The run_stream() method yields events as the workflow processes data
-        # Iterate through all events emitted during workflow execution
-        async for event in workflow.run_stream(f"Customer feedback: {feedback}"):
-            # Check if the event is a WorkflowOutputEvent (contains agent output data)
-            # WorkflowOutputEvent fires when an agent completes processing and produces output
-            if isinstance(event, WorkflowOutputEvent):
-                # Cast the event data to a list of ChatMessage objects for type safety
-                # Append the messages to the outputs list for later retrieval and display
-                outputs.append(cast(list[ChatMessage], event.data))
-
-        # Display outputs
-        # Check if the workflow produced any output messages to display
-        # This ensures we don't attempt to print empty results
-        if outputs:
-            # Iterate through the messages in the final workflow output
-            # outputs[-1] contains the last (final) set of messages from the workflow
-            # enumerate() provides both the index and message for formatting
-            for i, msg in enumerate(outputs[-1], start=1):
-                # Extract the author name from the message, defaulting to agent role
-                # If no author_name is set, use "assistant" for AI agents or "user" for users
-                name = msg.author_name or ("assistant" if msg.role == Role.ASSISTANT else "user")
-                # Format and print the message with a visual separator and sequential numbering
-                # The output clearly shows who said what and in what order
-                print(f"{'-' * 60}\n{i:02d} [{name}]\n{msg.text}")
+        # The summarizer, classifier and action agents share the same chat client
+        summarizer, classifier, action = create_agents(chat_client)
+
+        # Run the summarizer and classifier concurrently on the sample feedback
+        summary, classification = await summarize_and_classify(summarizer, classifier, SAMPLE_FEEDBACK)
+
+        # Display the intermediate results and the header for the action agent
+        # Each agent's response text is printed with a visual separator and its name
+        # The whole block is written to the terminal in a single call
+        sys.stdout.write("\n".join(
+            f"{SEP}\n{i:02d} [{name}]\n{response.text}"
+            for i, (name, response) in enumerate((("summarizer", summary), ("classifier", classification)), start=1)
+        ) + f"\n{SEP}\n03 [action]\n")
+
+        # Run the action agent on the combined results and stream its output
+        # Only the action agent depends on both previous results, so it runs last
+        # run_stream() yields response chunks as they are generated
+        async for update in action.run_stream(f"Summary: {summary.text}\nClassification: {classification.text}"):
+            # Print the chunk immediately without a newline so the response appears as it is generated
+            # flush=True pushes the text to the terminal right away instead of waiting for a full line
+            print(update.text, end="", flush=True)
+        print()
 
 if __name__ == "__main__":
     # Entry point check ensures code only runs when script is executed directly, not imported
     # asyncio.run() creates and manages the event loop for async operations
     # This launches the main() coroutine and waits for it to complete execution
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -6,10 +6,125 @@ The agent is specialized in generating titles based on user input and maintains
 state throughout a conversation session using threads.
 """
 
+import asyncio
 import os
-from azure.ai.agents import AgentsClient
-from azure.identity import DefaultAzureCredential
-from azure.ai.agents.models import Agent, ListSortOrder, MessageRole
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from aiohttp import ClientSession, TCPConnector
+from azure.ai.agents.aio import AgentsClient
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.identity.aio import DefaultAzureCredential
+from dotenv import load_dotenv
+from azure.ai.agents.models import (
+    Agent,
+    ListSortOrder,
+    MessageDeltaChunk,
+    MessageRole,
+    RunStatus,
+    ThreadRun,
+    TruncationObject,
+    TruncationStrategy,
+)
+
+# Load configuration once at import
+# Missing settings raise a KeyError when the server starts rather than mid-request
+load_dotenv()
+PROJECT_ENDPOINT = os.environ["PROJECT_ENDPOINT"]
+MODEL_DEPLOYMENT_NAME = os.environ["MODEL_DEPLOYMENT_NAME"]
+
+# Process-wide cache for the Foundry agent
+# The agent is created in Azure AI Foundry once per process and shared by every
+# TitleAgent instance; the lock stops concurrent first calls from each creating one
+_agent_singleton: Agent | None = None
+_agent_lock = asyncio.Lock()
+
+# Process-wide Azure credential
+# Sharing one credential lets every client reuse its token cache instead of
+# acquiring a new token (for example by running the Azure CLI) per instance
+_credential: DefaultAzureCredential | None = None
+
+# Process-wide HTTP transport
+# Every client sends requests through one aiohttp session, so TLS connections to
+# Foundry are kept alive and reused instead of being set up again per client
+_transport: AioHttpTransport | None = None
+
+# Run statuses that mean the run has not finished yet and should be polled again
+# A cancelling run is still active on its thread until it reaches CANCELLED
+_PENDING_RUN_STATUSES = (
+    RunStatus.QUEUED,
+    RunStatus.IN_PROGRESS,
+    RunStatus.REQUIRES_ACTION,
+    RunStatus.CANCELLING,
+)
+
+# Only the newest message in a thread is sent to the model
+# Threads are reused between requests, so earlier requests must not leak into the prompt
+_SINGLE_TURN = TruncationObject(type=TruncationStrategy.LAST_MESSAGES, last_messages=1)
+
+def _get_credential() -> DefaultAzureCredential:
+    """
+    Return the process-wide credential, creating it on first use.
+    
+    Returns:
+        DefaultAzureCredential: The credential shared by all TitleAgent instances
+    """
+    global _credential
+    if _credential is None:
+        _credential = DefaultAzureCredential()
+    return _credential
+
+def _get_transport() -> AioHttpTransport:
+    """
+    Return the process-wide HTTP transport, creating it on first use.
+    
+    Must be called while an event loop is running, because the aiohttp session
+    is bound to the current loop.
+    
+    Returns:
+        AioHttpTransport: The transport shared by all TitleAgent instances
+    """
+    global _transport
+    if _transport is None:
+        session = ClientSession(connector=TCPConnector(limit=100, keepalive_timeout=30.0))
+        # session_owner=False stops each client from closing the shared session
+        _transport = AioHttpTransport(session=session, session_owner=False)
+    return _transport
+
+class RunEndedError(RuntimeError):
+    """
+    Raised when a streamed Foundry run ends in any status other than completed.
+    
+    Attributes:
+        status (RunStatus | None): The final status of the run, or None if the
+                                   stream ended without reporting one
+    """
+
+    def __init__(self, status: RunStatus | None, last_error: object = None):
+        """
+        Initialize the error.
+        
+        Args:
+            status (RunStatus | None): The final status of the run
+            last_error (object): The error reported by Foundry, if any
+        """
+        super().__init__(f'Run ended with status {status}' + (f' - {last_error}' if last_error else ''))
+        self.status = status
+
+
+class _ThreadLease:
+    """
+    A pooled thread borrowed for one run.
+    
+    Attributes:
+        thread_id (str): The ID of the borrowed thread
+        completed (bool): Set by the borrower once its run has completed; only
+                          threads whose run completed are returned to the pool
+    """
+
+    def __init__(self, thread_id: str):
+        self.thread_id = thread_id
+        self.completed = False
+
 
 class TitleAgent:
     """
@@ -17,42 +132,62 @@ class TitleAgent:
     
     This class handles:
     - Agent initialization and configuration
-    - Thread management for maintaining conversation state
+    - Thread pooling so conversation threads are reused between requests
     - Message sending and receiving with the Azure AI agent
     - Error handling for failed runs
     
+    The async AgentsClient is used so that awaiting Foundry calls yields to the
+    event loop, letting the A2A server handle other requests in the meantime.
+    
     Attributes:
         client (AgentsClient): The Azure AI agents client for API communication
         agent (Agent | None): The created title agent instance (lazy-loaded)
     """
 
-    def __init__(self):
+    def __init__(self, max_pool_size: int = 8):
         """
         Initialize the TitleAgent instance.
         
         Loads configuration from environment variables and creates an AgentsClient
-        connection to Azure AI Foundry using default credentials.
+        connection to Azure AI Foundry using default credentials. Must be called
+        while an event loop is running. Call close() when the instance is no
+        longer needed.
+        
+        Args:
+            max_pool_size (int): The maximum number of idle threads kept for reuse
         """
         
         # Create the agents client
         # DefaultAzureCredential uses Azure CLI authentication or managed identity
+        # The credential and HTTP transport are shared with every other TitleAgent in the process
         # This connects to Azure AI Foundry endpoint specified in environment
         self.client = AgentsClient(
-            endpoint=os.getenv("AGENT_ENDPOINT"),
-            credential=DefaultAzureCredential()
+            endpoint=PROJECT_ENDPOINT,
+            credential=_get_credential(),
+            transport=_get_transport()
         )
         
         # Initialize agent as None - it will be created on first use (lazy loading)
         # This pattern avoids unnecessary API calls if the agent isn't needed
         self.agent: Agent | None = None
 
+        # Runs that are still in progress, keyed by A2A task ID
+        # Several tasks can share a context, so the task ID identifies the run to cancel
+        # Each entry holds the (thread_id, run_id) needed to cancel the run in Foundry
+        self._active_runs: dict[str, tuple[str, str]] = {}
+
+        # Idle thread IDs available for reuse
+        # Threads are created on demand and returned here after a completed run
+        self._thread_pool: asyncio.Queue[str] = asyncio.Queue(maxsize=max_pool_size)
+
     async def create_agent(self) -> Agent:
         """
         Create or retrieve the title agent instance.
         
-        This method implements lazy loading - the agent is only created once and
-        cached for subsequent calls. This improves performance by avoiding duplicate
-        agent creation calls to Azure AI Foundry.
+        This method implements lazy loading - the agent is only created once per
+        process and cached for subsequent calls, including calls from other
+        TitleAgent instances. This avoids duplicate agent creation calls to
+        Azure AI Foundry.
         
         Returns:
             Agent: The created or cached title agent instance
@@ -65,37 +200,97 @@ class TitleAgent:
         if self.agent:
             return self.agent
 
-        # Create the title agent
-        # Configure a new agent with specific instructions for title generation
-        # The model deployment name is loaded from environment variables
-        self.agent = self.client.create_agent(
-            model=os.getenv("MODEL_DEPLOYMENT_NAME"),
-            name="title-agent",
-            instructions="You are a helpful AI assistant that generates creative and concise titles. "
-                        "Based on user input or content, generate an appropriate title that captures "
-                        "the essence of the topic. Keep titles brief, engaging, and professional."
-        )
+        global _agent_singleton
 
-        # Return the newly created agent instance
+        # Only one caller at a time may check and populate the process-wide cache
+        async with _agent_lock:
+            if _agent_singleton is None:
+                # Create the title agent
+                # Configure a new agent with specific instructions for title generation
+                # The model deployment name is loaded from environment variables
+                _agent_singleton = await self.client.create_agent(
+                    model=MODEL_DEPLOYMENT_NAME,
+                    name="title-agent",
+                    instructions="You are a helpful AI assistant that generates creative and concise titles. "
+                                "Based on user input or content, generate an appropriate title that captures "
+                                "the essence of the topic. Keep titles brief, engaging, and professional."
+                )
+
+        # Return the shared agent instance
+        self.agent = _agent_singleton
         return self.agent
         
-    async def run_conversation(self, user_message: str) -> list[str]:
+    @asynccontextmanager
+    async def _pooled_thread(self) -> AsyncIterator[_ThreadLease]:
+        """
+        Borrow a thread from the pool, creating a new one if none are idle.
+        
+        When the block exits normally, the thread is returned to the pool if the
+        borrower marked its run as completed. Otherwise (the run failed, was
+        cancelled, or expired) the thread is deleted, because Foundry rejects a
+        new run on a thread whose previous run may still be active. If the block
+        raises, the thread is deleted for the same reason.
+        
+        Yields:
+            _ThreadLease: A lease on a thread that no other request is using
+        """
+        try:
+            thread_id = self._thread_pool.get_nowait()
+        except asyncio.QueueEmpty:
+            thread = await self.client.threads.create()
+            thread_id = thread.id
+
+        lease = _ThreadLease(thread_id)
+        try:
+            yield lease
+        except BaseException:
+            # Delete the thread rather than dropping it, so failed requests do not
+            # leave threads behind in Foundry
+            await self._delete_thread(thread_id)
+            raise
+
+        if lease.completed:
+            try:
+                self._thread_pool.put_nowait(thread_id)
+                return
+            except asyncio.QueueFull:
+                pass
+        await self._delete_thread(thread_id)
+
+    async def _delete_thread(self, thread_id: str) -> None:
+        """
+        Delete a thread in Foundry, ignoring errors.
+        
+        Deleting is best-effort cleanup; a failure must not hide the result of
+        the request that used the thread.
+        
+        Args:
+            thread_id (str): The ID of the thread to delete
+        """
+        try:
+            await self.client.threads.delete(thread_id)
+        except Exception as delete_error:
+            print(f'Title Agent: Could not delete thread {thread_id} - {delete_error}')
+
+    async def run_conversation(self, user_message: str, task_id: str | None = None) -> list[str]:
         """
         Send a user message to the agent and retrieve its response.
         
         This method manages the complete conversation flow:
         1. Ensures the agent is initialized
-        2. Creates a new conversation thread for isolation
+        2. Borrows a conversation thread from the pool
         3. Sends the user message to the agent
         4. Processes the agent's response
         5. Returns the response or error message
         
         Args:
             user_message (str): The message to send to the title agent for processing
+            task_id (str | None): The A2A task ID of the request, used so the run
+                                  can be cancelled with cancel_run()
             
         Returns:
             list[str]: A list containing the agent's response text(s). Returns error
-                      messages if the run fails or no response is received.
+                      messages if the run fails, is cancelled, or no response is received.
                       
         Example:
             responses = await title_agent.run_conversation("Generate a title for a blog about AI")
@@ -106,83 +301,195 @@ class TitleAgent:
         if not self.agent:
             await self.create_agent()
 
-        # Create a thread for the chat session
-        # Threads maintain conversation state and allow multiple turns in a conversation
-        # Each thread is independent, allowing parallel conversations
-        thread = self.client.threads.create()
-        
-        # Send user message
-        # Add the user's message to the thread as the starting point for the agent
-        # The message role indicates this is input from the user
-        self.client.messages.create(
-            thread_id=thread.id,
-            role=MessageRole.USER,
-            content=user_message
-        )
+        # Borrow a thread for the chat session
+        # Threads are pooled and reused between calls, saving a round-trip to Foundry
+        async with self._pooled_thread() as lease:
+            thread_id = lease.thread_id
 
-        # Create and run the agent
-        # This processes the message through the agent and executes any tools if needed
-        # create_and_process waits for completion before returning
-        run = self.client.runs.create_and_process(
-            thread_id=thread.id,
-            agent_id=self.agent.id
-        )
+            # Send user message
+            # Add the user's message to the thread as the starting point for the agent
+            # The message role indicates this is input from the user
+            await self.client.messages.create(
+                thread_id=thread_id,
+                role=MessageRole.USER,
+                content=user_message
+            )
+
+            # Create and run the agent
+            # The run starts in the background in Foundry and is polled until it finishes
+            run = await self.client.runs.create(
+                thread_id=thread_id,
+                agent_id=self.agent.id,
+                truncation_strategy=_SINGLE_TURN
+            )
+            if task_id:
+                self._active_runs[task_id] = (thread_id, run.id)
+
+            # Poll the run status with exponential backoff
+            # asyncio.sleep yields to the event loop so other requests are served while waiting
+            # A cancelled run is polled until it has fully stopped
+            try:
+                delay = 0.2
+                while run.status in _PENDING_RUN_STATUSES:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 1.5, 2.0)
+                    run = await self.client.runs.get(thread_id=thread_id, run_id=run.id)
+            finally:
+                if task_id:
+                    self._active_runs.pop(task_id, None)
+
+            # Check if the agent run completed successfully
+            # Failures can occur due to API issues, timeout, or model errors
+            if run.status == RunStatus.FAILED:
+                print(f'Title Agent: Run failed - {run.last_error}')
+                return [f'Error: {run.last_error}']
+
+            if run.status == RunStatus.CANCELLED:
+                return ['Run cancelled']
+
+            # Any other unfinished outcome (for example an expired run) has no usable response
+            if run.status != RunStatus.COMPLETED:
+                print(f'Title Agent: Run ended with status {run.status}')
+                return [f'Error: Run ended with status {run.status}']
+
+            # Only a thread whose run completed is safe to reuse
+            lease.completed = True
+
+            # Get the response message
+            # Only messages created by this run are requested, newest first and one at a time,
+            # so the payload does not grow with the pooled thread's history
+            messages = self.client.messages.list(
+                thread_id=thread_id,
+                run_id=run.id,
+                order=ListSortOrder.DESCENDING,
+                limit=1
+            )
+
+            # Return the text of the agent's latest response
+            # The list is paged from the service, so it is consumed with async for
+            async for msg in messages:
+                if msg.text_messages:
+                    return [text_msg.text.value for text_msg in msg.text_messages]
+                break
+
+            # Return a default message if no response was found
+            # This ensures the caller always gets a response (success or default message)
+            return ['No response received']
+
+    async def stream_conversation(self, user_message: str, task_id: str | None = None) -> AsyncIterator[str]:
+        """
+        Send a user message to the agent and yield its response as it is generated.
+        
+        Uses the Foundry run streaming API so callers receive the first tokens of
+        the response without waiting for the whole run to complete.
+        
+        Args:
+            user_message (str): The message to send to the title agent for processing
+            task_id (str | None): The A2A task ID of the request, used so the run
+                                  can be cancelled with cancel_run()
+            
+        Yields:
+            str: Successive fragments of the agent's response text
+            
+        Raises:
+            RunEndedError: If the run fails, is cancelled, expires, or the stream
+                           ends before the run completes
+            
+        Example:
+            async for delta in title_agent.stream_conversation("Generate a title for a blog about AI"):
+                print(delta, end="")
+        """
+        if not self.agent:
+            await self.create_agent()
+
+        # Borrow a thread for the chat session and send the user message
+        async with self._pooled_thread() as lease:
+            thread_id = lease.thread_id
+            await self.client.messages.create(
+                thread_id=thread_id,
+                role=MessageRole.USER,
+                content=user_message
+            )
+
+            # Create the run and stream its events
+            # Message deltas carry the response text; run events carry the run status
+            status: RunStatus | None = None
+            try:
+                async with await self.client.runs.stream(
+                    thread_id=thread_id,
+                    agent_id=self.agent.id,
+                    truncation_strategy=_SINGLE_TURN
+                ) as stream:
+                    async for _event_type, event_data, _ in stream:
+                        if isinstance(event_data, MessageDeltaChunk):
+                            if event_data.text:
+                                yield event_data.text
+                        elif isinstance(event_data, ThreadRun):
+                            if task_id:
+                                self._active_runs[task_id] = (thread_id, event_data.id)
+                            status = event_data.status
+                            if status not in _PENDING_RUN_STATUSES and status != RunStatus.COMPLETED:
+                                print(f'Title Agent: Run ended with status {status} - {event_data.last_error}')
+                                raise RunEndedError(status, event_data.last_error)
+            finally:
+                if task_id:
+                    self._active_runs.pop(task_id, None)
+
+            # A stream that stops before the run completes has only a partial response
+            if status != RunStatus.COMPLETED:
+                raise RunEndedError(status)
 
-        # Check if the agent run completed successfully
-        # Failures can occur due to API issues, timeout, or model errors
-        if run.status == 'failed':
-            print(f'Title Agent: Run failed - {run.last_error}')
-            return [f'Error: {run.last_error}']
-
-        # Get response messages
-        # Retrieve all messages from the thread, sorted in descending order (newest first)
-        # This ensures we get the most recent agent response
-        messages = self.client.messages.list(thread_id=thread.id, order=ListSortOrder.DESCENDING)
-        
-        # Process messages to extract the agent's response
-        responses = []
-        # Iterate through messages looking for the agent's latest response
-        for msg in messages:
-            # Only get the latest assistant response
-            # Filter to only AGENT role messages that contain text content
-            # The agent may produce multiple response types; we only care about text
-            if msg.role == MessageRole.AGENT and msg.text_messages:
-                # Extract the text value from each message
-                # Multiple text messages can exist but typically there's one primary response
-                for text_msg in msg.text_messages:
-                    responses.append(text_msg.text.value)
-                # Break after first agent message to get only the latest response
-                # Messages are sorted newest first, so first match is the most recent
-                break 
-
-        # Return the collected responses, or a default message if none found
-        # This ensures the caller always gets a response (success or default message)
-        return responses if responses else ['No response received']
-
-
-async def create_foundry_title_agent() -> TitleAgent:
+            # Only a thread whose run completed is safe to reuse
+            lease.completed = True
+
+    async def cancel_run(self, task_id: str) -> None:
+        """
+        Cancel the Foundry run started for the given A2A task, if it is still active.
+        
+        Args:
+            task_id (str): The A2A task ID passed to run_conversation()
+                           or stream_conversation()
+            
+        Example:
+            await title_agent.cancel_run(task_id)
+        """
+        active_run = self._active_runs.pop(task_id, None)
+        if active_run:
+            thread_id, run_id = active_run
+            # The run may finish just before the cancel arrives, and Foundry then
+            # rejects the cancel; the caller still has to update the task either way
+            try:
+                await self.client.runs.cancel(thread_id=thread_id, run_id=run_id)
+            except Exception as cancel_error:
+                print(f'Title Agent: Could not cancel run {run_id} - {cancel_error}')
+
+    async def close(self) -> None:
+        """
+        Close the agents client.
+        
+        The instance should not be used after it has been closed. The shared
+        credential and HTTP connections stay open; they are closed by
+        close_shared_resources().
+        
+        Example:
+            await title_agent.close()
+        """
+        await self.client.close()
+
+
+async def close_shared_resources() -> None:
     """
-    Factory function to create and initialize a fully configured TitleAgent.
+    Close the resources shared by all TitleAgent instances in the process.
     
-    This function provides a convenient way to instantiate a TitleAgent that is
-    ready to use for generating titles. It handles the initialization sequence
-    automatically.
+    Call this once at shutdown, after every TitleAgent has been closed.
     
-    Returns:
-        TitleAgent: A fully initialized TitleAgent instance with the agent created
-                   and ready to process conversations
-                   
     Example:
-        title_agent = await create_foundry_title_agent()
-        responses = await title_agent.run_conversation("Generate a title for a tech article")
+        await close_shared_resources()
     """
-    # Create a new TitleAgent instance
-    # This calls __init__ which sets up the Azure client connection
-    agent = TitleAgent()
-    
-    # Initialize the agent within the TitleAgent instance
-    # This creates the actual agent in Azure AI Foundry
-    await agent.create_agent()
-    
-    # Return the fully initialized agent ready for use
-    return agent
+    global _credential, _transport
+    if _credential is not None:
+        await _credential.close()
+        _credential = None
+    if _transport is not None:
+        await _transport.session.close()
+        _transport = None
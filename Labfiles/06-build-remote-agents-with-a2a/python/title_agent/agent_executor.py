@@ -6,13 +6,21 @@ It handles incoming A2A requests, processes them through the Foundry agent,
 and returns generated titles.
 """
 
+import time
+
 from a2a.server.events.event_queue import EventQueue
 from a2a.server.agent_execution import AgentExecutor
 from a2a.server.agent_execution.context import RequestContext
 from a2a.server.tasks import TaskUpdater
 from a2a.utils import new_agent_text_message
 from a2a.types import AgentCard, Part, TaskState
-from title_agent.agent import TitleAgent, create_foundry_title_agent
+from azure.ai.agents.models import RunStatus
+from title_agent.agent import RunEndedError, TitleAgent
+
+# Streamed response fragments are published in batches rather than one per token
+# A batch is sent once it holds this many fragments or this many seconds have passed
+STREAM_FLUSH_CHUNKS = 16
+STREAM_FLUSH_INTERVAL = 0.1
 
 
 class FoundryAgentExecutor(AgentExecutor):
@@ -20,7 +28,8 @@ class FoundryAgentExecutor(AgentExecutor):
     Executes title generation requests using Azure AI Foundry.
     
     This executor handles the A2A protocol request lifecycle including
-    validation, agent execution, and response formatting.
+    validation, agent execution, and response formatting. The Foundry agent
+    is created by the server at startup and attached with attach_agent().
     """
 
     def __init__(self, card: AgentCard):
@@ -36,79 +45,118 @@ class FoundryAgentExecutor(AgentExecutor):
         self._card = card
         self._foundry_agent: TitleAgent | None = None
 
-    async def _get_or_create_agent(self) -> TitleAgent:
+    def attach_agent(self, agent: TitleAgent) -> None:
         """
-        Get or create the Foundry title agent instance.
+        Attach the Foundry title agent that processes requests.
         
-        Uses lazy initialization to create the agent only when needed.
-        
-        Returns:
-            TitleAgent: The initialized title generation agent
+        Args:
+            agent (TitleAgent): An initialized title generation agent
             
         Example:
-            agent = await executor._get_or_create_agent()
+            executor.attach_agent(title_agent)
         """
-        if not self._foundry_agent:
-            self._foundry_agent = await create_foundry_title_agent()
-        return self._foundry_agent
+        self._foundry_agent = agent
 
-    async def _process_request(self, message_parts: list[Part], context_id: str, task_updater: TaskUpdater) -> None:
+    async def _process_request(
+        self, message_parts: list[Part], context_id: str, task_id: str, task_updater: TaskUpdater
+    ) -> None:
         """
         Process a user request through the Foundry agent.
         
-        Validates input, executes the title generation agent, and updates task status
-        with the generated response.
+        Validates input, executes the title generation agent, and streams the
+        generated response to the caller as working status updates before
+        completing the task with the full response. Invalid input marks the task
+        as failed without calling the agent.
         
         Args:
             message_parts (list[Part]): The incoming message parts from A2A protocol
             context_id (str): The unique context ID for this request
+            task_id (str): The ID of the task, used to cancel the Foundry run for it
             task_updater (TaskUpdater): The task updater for tracking execution state
             
-        Raises:
-            ValueError: If message_parts is empty or invalid
-            
         Example:
-            await executor._process_request(parts, context_id, updater)
+            await executor._process_request(parts, context_id, task_id, updater)
         """
-        try:
-            # Input validation - check for empty message parts
-            if not message_parts or len(message_parts) == 0:
-                raise ValueError("No message parts provided")
-            
-            # Input validation - check for missing text content
-            if not message_parts[0].root or not message_parts[0].root.text:
-                raise ValueError("Message part does not contain text")
-
-            # Retrieve message from A2A parts
-            user_message = message_parts[0].root.text
+        # Input validation - check for empty message parts
+        if not message_parts:
+            await self._fail_validation("No message parts provided", context_id, task_updater)
+            return
+
+        # Input validation - check for missing text content
+        # Retrieve message from A2A parts; non-text parts have no text attribute
+        user_message = getattr(message_parts[0].root, 'text', None)
+        if not user_message:
+            await self._fail_validation("Message part does not contain text", context_id, task_updater)
+            return
 
-            # Get the title agent
-            agent = await self._get_or_create_agent()
-
-            # Update the task status to running
-            await task_updater.running()
+        try:
+            # Get the title agent attached at server startup
+            agent = self._foundry_agent
+            if agent is None:
+                raise RuntimeError("Title agent has not been initialized")
 
             # Run the agent conversation to generate title
-            response = await agent.generate_title(user_message)
+            # Fragments are published in small batches so callers see the first tokens
+            # early without an event queue update for every single token
+            chunks: list[str] = []
+            buf: list[str] = []
+            last_flush = time.monotonic()
+            async for delta in agent.stream_conversation(user_message, task_id):
+                chunks.append(delta)
+                buf.append(delta)
+                if len(buf) >= STREAM_FLUSH_CHUNKS or time.monotonic() - last_flush >= STREAM_FLUSH_INTERVAL:
+                    await self._publish_chunk(buf, context_id, task_updater)
+                    last_flush = time.monotonic()
+
+            # Publish whatever is left from the end of the stream
+            if buf:
+                await self._publish_chunk(buf, context_id, task_updater)
+            response = "".join(chunks) or "No response received"
 
             # Mark the task as complete with the generated response
-            await task_updater.completed(
+            await task_updater.complete(
                 message=new_agent_text_message(response, context_id=context_id)
             )
 
-        except ValueError as validation_error:
-            """Handle input validation errors with detailed error message"""
-            print(f'Title Agent: Validation error - {validation_error}')
-            await task_updater.failed(
-                message=new_agent_text_message(f"Invalid request: {str(validation_error)}", context_id=context_id)
-            )
         except Exception as execution_error:
             """Handle unexpected errors during agent execution"""
+            # A cancelled run was stopped by cancel(), which has already canceled the task
+            if isinstance(execution_error, RunEndedError) and execution_error.status == RunStatus.CANCELLED:
+                return
             print(f'Title Agent: Error processing request - {execution_error}')
             await task_updater.failed(
                 message=new_agent_text_message("Title Agent failed to process the request.", context_id=context_id)
             )
 
+    async def _publish_chunk(self, buf: list[str], context_id: str, task_updater: TaskUpdater) -> None:
+        """
+        Publish buffered response fragments as one working status update and clear the buffer.
+        
+        Args:
+            buf (list[str]): The response fragments received since the last update
+            context_id (str): The unique context ID for this request
+            task_updater (TaskUpdater): The task updater for tracking execution state
+        """
+        await task_updater.update_status(
+            TaskState.working,
+            message=new_agent_text_message("".join(buf), context_id=context_id)
+        )
+        buf.clear()
+
+    async def _fail_validation(self, reason: str, context_id: str, task_updater: TaskUpdater) -> None:
+        """
+        Mark the task as failed because the request input was invalid.
+        
+        Args:
+            reason (str): Why the input was rejected
+            context_id (str): The unique context ID for this request
+            task_updater (TaskUpdater): The task updater for tracking execution state
+        """
+        print(f'Title Agent: Validation error - {reason}')
+        await task_updater.failed(
+            message=new_agent_text_message(f"Invalid request: {reason}", context_id=context_id)
+        )
+
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         """
         Execute the agent for the given request context.
@@ -131,13 +179,15 @@ class FoundryAgentExecutor(AgentExecutor):
         await updater.start_work()
 
         # Process the incoming request through the title agent
-        await self._process_request(context.message, context.context_id, updater)
+        await self._process_request(context.message.parts, context.context_id, context.task_id, updater)
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
         """
         Cancel execution of a task.
         
-        Marks the task as failed due to user cancellation and notifies via event queue.
+        Cancels the Foundry run for the task, if one is still in progress, then
+        marks the task as canceled, as the A2A tasks/cancel flow requires, and
+        notifies via event queue.
         
         Args:
             context (RequestContext): The A2A request context to cancel
@@ -148,8 +198,12 @@ class FoundryAgentExecutor(AgentExecutor):
         """
         print(f'Title Agent: Cancelling execution for context {context.context_id}')
 
+        # Stop the run in Foundry so it does not keep generating after the task is cancelled
+        if self._foundry_agent:
+            await self._foundry_agent.cancel_run(context.task_id)
+
         updater = TaskUpdater(event_queue, context.task_id, context.context_id)
-        await updater.failed(
+        await updater.cancel(
             message=new_agent_text_message('Task cancelled by user', context_id=context.context_id)
         )
 
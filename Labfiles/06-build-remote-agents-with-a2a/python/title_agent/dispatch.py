@@ -0,0 +1,279 @@
+"""
+ASGI request dispatch for the Title Agent server
+
+This module provides a pure ASGI front end that sits in front of the Starlette
+application. Requests for fixed (static) paths are matched with a single
+dictionary lookup instead of Starlette's router testing each route in turn.
+When every route has a fixed path, the dispatcher answers all HTTP requests
+itself and the Starlette application only handles the lifespan protocol.
+It also provides constant endpoints that answer without creating Starlette
+Request or Response objects.
+
+The module is plain Python, but it runs on every request, so it can optionally
+be compiled with Cython for a little less interpreter overhead:
+
+    pip install cython
+    cythonize -i -3 title_agent/dispatch.py
+
+Python imports the compiled extension module in place of this file when it is
+present; delete the generated .c and .so/.pyd files to go back to the source.
+"""
+
+from collections.abc import Collection
+
+from starlette.datastructures import URL
+from starlette.responses import RedirectResponse
+from starlette.routing import BaseRoute, Route
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class StaticPathDispatcher:
+    """
+    ASGI middleware that sends requests for static paths straight to their route.
+
+    Routes without path parameters, and any raw ASGI endpoints passed in, are
+    indexed by path when the dispatcher is created. HTTP requests for an indexed
+    path (relative to the ASGI root_path) are handled directly, and a request
+    that only differs from an indexed path by a trailing slash is redirected,
+    as Starlette's router does. Requests for other paths are passed on to the
+    wrapped application if it has routes with path parameters, and otherwise
+    answered with 404 here. Lifespan events always go to the wrapped application.
+
+    Attributes:
+        app (ASGIApp): The wrapped application that handles all other requests
+    """
+
+    def __init__(self, app: ASGIApp, routes: list[BaseRoute], endpoints: dict[str, ASGIApp] | None = None):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            app (ASGIApp): The application to fall through to, usually the Starlette app
+            routes (list[BaseRoute]): The routes served by the application
+            endpoints (dict[str, ASGIApp] | None): Raw ASGI endpoints keyed by path,
+                                                   served without going through a route;
+                                                   each endpoint checks its own HTTP methods
+
+        Example:
+            app = StaticPathDispatcher(Starlette(routes=routes), routes, {'/health': health_check})
+        """
+        self.app = app
+
+        # Map each static path to the ASGI callable that serves it
+        # Routes with path parameters (e.g. /tasks/{id}) are left to Starlette
+        self._static_routes: dict[str, ASGIApp] = {
+            route.path: _route_app(route)
+            for route in routes
+            if is_static_route(route)
+        }
+        self._static_routes.update(endpoints or {})
+
+        # Only routes with path parameters need the wrapped application's router
+        # Without any, an unknown path is answered here without going through Starlette
+        self._has_dynamic_routes = not all(is_static_route(route) for route in routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handle an ASGI connection.
+
+        Args:
+            scope (Scope): The ASGI connection scope
+            receive (Receive): The ASGI receive channel
+            send (Send): The ASGI send channel
+        """
+        if scope['type'] == 'http':
+            path = _route_path(scope)
+            handler = self._static_routes.get(path)
+            if handler is not None:
+                await handler(scope, receive, send)
+                return
+
+            # Redirect to the same path with the trailing slash added or removed
+            # if that is a static path, matching Starlette's redirect_slashes
+            if path != '/':
+                redirect_path = path.rstrip('/') if path.endswith('/') else path + '/'
+                if redirect_path in self._static_routes:
+                    redirect_scope = dict(scope)
+                    redirect_scope['path'] = (
+                        scope['path'].rstrip('/') if path.endswith('/') else scope['path'] + '/'
+                    )
+                    response = RedirectResponse(url=str(URL(scope=redirect_scope)))
+                    await response(scope, receive, send)
+                    return
+
+            if not self._has_dynamic_routes:
+                await _not_found(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+
+def _route_path(scope: Scope) -> str:
+    """
+    Return the request path relative to the ASGI root_path, as Starlette's router matches it.
+
+    Args:
+        scope (Scope): The ASGI connection scope
+
+    Returns:
+        str: The path with the root_path prefix removed
+    """
+    path = scope['path']
+    root_path = scope.get('root_path')
+    if not root_path or not path.startswith(root_path):
+        return path
+    if path == root_path:
+        return ''
+    if path[len(root_path)] == '/':
+        return path[len(root_path):]
+    return path
+
+
+def is_static_route(route: BaseRoute) -> bool:
+    """
+    Check whether a route matches exactly one fixed path.
+
+    Args:
+        route (BaseRoute): The route to check
+
+    Returns:
+        bool: True for a plain Route without path parameters, False for routes with
+              parameters and for mounts, hosts, and other route types
+    """
+    return isinstance(route, Route) and not route.param_convertors
+
+
+def _route_app(route: Route) -> ASGIApp:
+    """
+    Wrap a Starlette route as an ASGI callable for the dispatcher.
+
+    Args:
+        route (Route): A route without path parameters
+
+    Returns:
+        ASGIApp: A callable that serves the route as Starlette's router would
+    """
+    async def handle(scope: Scope, receive: Receive, send: Send) -> None:
+        # Fill in what Starlette's router would have added for a matched route,
+        # then call the route's request handler directly
+        scope['endpoint'] = route.endpoint
+        scope['path_params'] = {}
+        await route.app(scope, receive, send)
+
+    # route.methods is None for routes that accept any method
+    return _allow_methods(handle, route.methods)
+
+
+def _allow_methods(app: ASGIApp, methods: Collection[str] | None) -> ASGIApp:
+    """
+    Restrict an ASGI endpoint to the given HTTP methods.
+
+    Other methods are answered with a pre-encoded 405 response that lists the
+    allowed methods in its Allow header.
+
+    Args:
+        app (ASGIApp): The endpoint to protect
+        methods (Collection[str] | None): The allowed methods; None allows any method
+
+    Returns:
+        ASGIApp: The endpoint, wrapped with the method check if methods are given
+    """
+    if not methods:
+        return app
+
+    # The allowed methods and the 405 response are prepared once per endpoint
+    allowed = frozenset(methods)
+    method_not_allowed = plain_text_endpoint(
+        'Method Not Allowed',
+        status=405,
+        headers=[(b'allow', ', '.join(sorted(allowed)).encode())],
+        methods=None,
+    )
+
+    async def guarded(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['method'] not in allowed:
+            await method_not_allowed(scope, receive, send)
+            return
+        await app(scope, receive, send)
+
+    return guarded
+
+
+def plain_text_endpoint(
+    text: str,
+    status: int = 200,
+    headers: list[tuple[bytes, bytes]] | None = None,
+    methods: Collection[str] | None = ('GET', 'HEAD'),
+) -> ASGIApp:
+    """
+    Create an ASGI endpoint that always sends the same plain text response.
+
+    Args:
+        text (str): The response body
+        status (int): The HTTP status code
+        headers (list[tuple[bytes, bytes]] | None): Extra response headers, as
+                                                    lower-case name and value bytes
+        methods (Collection[str] | None): The allowed HTTP methods; others get 405.
+                                          None allows any method
+
+    Returns:
+        ASGIApp: The endpoint
+
+    Example:
+        health_check = plain_text_endpoint('Agent is running!')
+    """
+    return static_endpoint(text.encode(), b'text/plain; charset=utf-8', status, headers, methods)
+
+
+def static_endpoint(
+    body: bytes,
+    content_type: bytes,
+    status: int = 200,
+    headers: list[tuple[bytes, bytes]] | None = None,
+    methods: Collection[str] | None = ('GET', 'HEAD'),
+) -> ASGIApp:
+    """
+    Create an ASGI endpoint that always sends the same pre-encoded response.
+
+    The body and headers are prepared once, so each request only sends two
+    pre-built ASGI messages.
+
+    Args:
+        body (bytes): The encoded response body
+        content_type (bytes): The value of the content-type header
+        status (int): The HTTP status code
+        headers (list[tuple[bytes, bytes]] | None): Extra response headers, as
+                                                    lower-case name and value bytes
+        methods (Collection[str] | None): The allowed HTTP methods; others get 405.
+                                          None allows any method
+
+    Returns:
+        ASGIApp: The endpoint
+
+    Example:
+        card_endpoint = static_endpoint(card_json, b'application/json')
+    """
+    start_message = {
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type),
+            (b'content-length', str(len(body)).encode()),
+            *(headers or []),
+        ],
+    }
+    body_message = {'type': 'http.response.body', 'body': body}
+
+    # ASGI requires the start and body messages to be sent separately, and Uvicorn
+    # writes the headers to the socket as soon as the start message arrives, so the
+    # two writes cannot be merged from here; content-length at least keeps the body
+    # to a single write without chunked framing
+    async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+        await send(start_message)
+        await send(body_message)
+
+    return _allow_methods(endpoint, methods)
+
+
+# Response for paths that no route serves, matching Starlette's default 404
+_not_found = plain_text_endpoint('Not Found', status=404, methods=None)
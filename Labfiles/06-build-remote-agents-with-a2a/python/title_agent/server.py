@@ -16,8 +16,25 @@ Architecture:
 - InMemoryTaskStore: Tracks task execution state (execution, pending, results)
 """
 
+import asyncio
+import multiprocessing
+import multiprocessing.connection
 import os
+import signal
+import socket
+import sys
+import time
+from contextlib import asynccontextmanager
+
 import uvicorn
+from uvicorn.supervisors import Multiprocess  # Runs several server processes on one socket
+
+# uvloop is a faster, libuv-based event loop
+# It is not available on Windows or PyPy, so the server falls back to asyncio there
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 # A2A (Agent-to-Agent) Protocol Imports
 # These imports provide the framework for agent-to-agent communication
@@ -28,6 +45,7 @@ from a2a.server.tasks import InMemoryTaskStore  # In-memory storage for task exe
 # A2A Type Definitions
 # These define the structures for agent metadata and capabilities
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH  # Discovery path for the agent card
 
 # Environment Configuration
 from dotenv import load_dotenv  # Load environment variables from .env file
@@ -35,14 +53,20 @@ from dotenv import load_dotenv  # Load environment variables from .env file
 # Starlette Web Framework Imports
 # Starlette is a lightweight ASGI framework for building web applications
 from starlette.applications import Starlette  # Main Starlette application
-from starlette.requests import Request  # HTTP request object
-from starlette.responses import PlainTextResponse  # Simple text HTTP response
-from starlette.routing import Route  # Route definition for URL endpoints
+from starlette.types import ASGIApp  # Type of an ASGI application
 
 # Agent Executor Import
 # This creates the actual agent that processes title generation requests
+# TitleAgent wraps the Foundry agent that is warmed up at startup and
+# close_shared_resources releases the process-wide Azure credential and HTTP
+# connections at shutdown
+from title_agent.agent import TitleAgent, close_shared_resources
 from title_agent.agent_executor import create_foundry_agent_executor
 
+# Request Dispatch Import
+# Answers requests for static paths before they reach Starlette's router
+from title_agent.dispatch import StaticPathDispatcher, is_static_route, plain_text_endpoint, static_endpoint
+
 # Load environment variables from .env file
 # This sets up configuration like SERVER_URL and TITLE_AGENT_PORT
 load_dotenv()
@@ -52,8 +76,47 @@ load_dotenv()
 # ============================================================================
 # Load server configuration from environment variables
 # These variables define where the server will run and what port it will use
-host = os.environ["SERVER_URL"]
-port = os.environ["TITLE_AGENT_PORT"]
+# They are read and parsed once when the module is loaded
+_HOST: str = os.environ["SERVER_URL"]
+_PORT: int = int(os.environ["TITLE_AGENT_PORT"])
+
+# Address family of the listening socket
+# As with Uvicorn, a host containing ':' is an IPv6 address and anything else is IPv4
+_BIND_FAMILY: socket.AddressFamily = socket.AF_INET6 if ':' in _HOST else socket.AF_INET
+
+# Resolve the host name to an IP address once so binding the socket needs no DNS lookup
+# If it cannot be resolved the name is kept, and binding the listening socket then
+# reports the resolution error; the agent card still advertises the original name
+try:
+    _BIND_HOST: str = socket.getaddrinfo(_HOST, _PORT, _BIND_FAMILY, socket.SOCK_STREAM)[0][4][0]
+except OSError:
+    _BIND_HOST = _HOST
+
+# Number of server processes to run
+# Each worker is a separate process with its own GIL, Foundry agent, and task store.
+# Tasks live in an in-memory store, so follow-up calls for a task (get, cancel) only
+# work if they reach the same worker; keep the default of 1 unless callers only use
+# single-request message/send or message/stream calls.
+workers = int(os.getenv("TITLE_AGENT_WORKERS", "1"))
+
+# Per-request access logging is off by default; set TITLE_AGENT_ACCESS_LOG=true
+# to log each request while debugging
+access_log = os.getenv("TITLE_AGENT_ACCESS_LOG", "false").lower() == "true"
+
+# ASGI server that runs the app: 'uvicorn' (default), 'granian', or 'hypercorn'
+# Granian is a Rust-based ASGI server and Hypercorn adds HTTP/2 support; both are
+# optional and must be installed separately
+server_backend = os.getenv("TITLE_AGENT_SERVER", "uvicorn")
+SERVER_BACKENDS = ('uvicorn', 'granian', 'hypercorn')
+
+# Worker processes that exit sooner than this many seconds after starting are
+# treated as failing at startup and are not restarted
+WORKER_MIN_UPTIME = 10.0
+
+# Optional CPU to pin a single-process server to (Linux only)
+# Keeping the event loop on one core avoids losing its cache state when the
+# scheduler moves it; leave unset to let the OS schedule the process freely
+cpu = int(os.environ["TITLE_AGENT_CPU"]) if os.getenv("TITLE_AGENT_CPU") else None
 
 # ============================================================================
 # Define Agent Skills
@@ -99,14 +162,19 @@ agent_card = AgentCard(
     name='AI Foundry Title Agent',
     description='An intelligent title generator agent powered by Foundry. '
     'I can help you generate catchy titles for your articles.',
-    url=f'http://{host}:{port}/',
+    url=f'http://{_HOST}:{_PORT}/',
     version='1.0.0',
     default_input_modes=['text'],
     default_output_modes=['text'],
-    capabilities=AgentCapabilities(),
+    capabilities=AgentCapabilities(streaming=True),
     skills=skills,
 )
 
+# Serialize the agent card once at startup
+# The card never changes while the server runs, so discovery requests can be
+# answered with these bytes instead of re-serializing the card each time
+AGENT_CARD_JSON = agent_card.model_dump_json(by_alias=True, exclude_none=True).encode()
+
 # ============================================================================
 # Create Agent Executor
 # ============================================================================
@@ -152,25 +220,30 @@ a2a_app = A2AStarletteApplication(
 # ============================================================================
 # Configure Application Routes
 # ============================================================================
+# Serve the agent card from the pre-serialized bytes
+# The card and its headers never change, so it is a raw ASGI endpoint that sends
+# the same pre-encoded response every time, served by the dispatcher
+# Clients may cache the card for a few minutes
+agent_card_endpoint = static_endpoint(
+    AGENT_CARD_JSON,
+    b'application/json',
+    headers=[(b'cache-control', b'public, max-age=300')],
+)
+
+# Paths on which the A2A application publishes the agent card
+# The older agent.json path is included for SDK versions that still serve it
+AGENT_CARD_PATHS = {AGENT_CARD_WELL_KNOWN_PATH, '/.well-known/agent.json'}
+
 # Get the default routes from the A2A application
 # These routes handle the A2A protocol communication endpoints
-routes = a2a_app.routes()
+# The agent card routes are left out because the card is served by agent_card_endpoint
+routes = [route for route in a2a_app.routes() if route.path not in AGENT_CARD_PATHS]
 
 # Add a health check endpoint for monitoring
 # This allows external systems to verify the agent is running
-async def health_check(request: Request) -> PlainTextResponse:
-    """
-    Health check endpoint that returns a simple status message.
-    
-    Args:
-        request: The incoming HTTP request
-        
-    Returns:
-        PlainTextResponse: A simple text response indicating the agent is running
-    """
-    return PlainTextResponse('AI Foundry Title Agent is running!')
-
-routes.append(Route(path='/health', methods=['GET'], endpoint=health_check))
+# Monitoring polls it constantly, so it is a raw ASGI endpoint with a pre-encoded
+# response that is served by the dispatcher without going through Starlette
+health_check = plain_text_endpoint('AI Foundry Title Agent is running!')
 
 # ============================================================================
 # Create Starlette Web Application
@@ -180,8 +253,287 @@ routes.append(Route(path='/health', methods=['GET'], endpoint=health_check))
 #
 # The app includes:
 #   - A2A protocol routes (for agent communication)
-#   - Health check route (for monitoring)
-app = Starlette(routes=routes)
+#   - Lifespan handler (for warming up the Foundry agent on startup and
+#     closing its connections on shutdown)
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    """
+    Manage resources that live for the lifetime of the server.
+    
+    On startup, creates the TitleAgent, warms it up by creating the Foundry
+    agent so the credential, connection pool, and agent are ready before the
+    first real request, and attaches it to the agent executor. The warmup does
+    not start a model run, so starting a server process costs no model usage.
+    On shutdown, closes the agent's client, the shared Azure credential, and the
+    shared HTTP connection pool.
+    
+    Args:
+        app: The Starlette application being started
+    """
+    agent = TitleAgent()
+    try:
+        # create_agent() acquires a token and opens a pooled connection to Foundry
+        await agent.create_agent()
+    except Exception as warmup_error:
+        # A failed warmup only costs latency on the first request, so startup continues
+        print(f'Title Agent: Warmup failed - {warmup_error}')
+    app.state.agent = agent
+    agent_executor.attach_agent(agent)
+
+    yield
+
+    await agent.close()
+    await close_shared_resources()
+
+# Static routes are always answered by the dispatcher below, so Starlette's router
+# only needs the routes with path parameters, kept in the order A2A declares them.
+# Paths that match nothing are then rejected without testing every static route first.
+starlette_app = Starlette(
+    routes=[route for route in routes if not is_static_route(route)],
+    lifespan=lifespan,
+)
+
+# Build the middleware stack now instead of on the first request
+# Starlette otherwise assembles the router, exception handlers, and middleware
+# when the first request (or lifespan event) arrives, which adds to its latency
+starlette_app.middleware_stack = starlette_app.build_middleware_stack()
+
+# ============================================================================
+# Create ASGI Entry Point
+# ============================================================================
+# Every route served here has a fixed path, so requests are matched with a
+# dictionary lookup in front of Starlette instead of a scan of the route list.
+# The dispatcher checks the HTTP method itself, calls each route's request
+# handler directly, and answers unknown paths with 404. The health check is
+# served by the dispatcher directly as well, and so is the agent card.
+# Since the A2A routes have no path parameters, the Starlette application only
+# handles lifespan events (and any parameterised routes a newer SDK adds).
+app = StaticPathDispatcher(
+    starlette_app,
+    routes,
+    {'/health': health_check, **dict.fromkeys(AGENT_CARD_PATHS, agent_card_endpoint)},
+)
+
+# ============================================================================
+# Configure Uvicorn
+# ============================================================================
+# Length of the queue of connections waiting to be accepted
+# 4096 lets more pending connections queue during bursts
+LISTEN_BACKLOG = 4096
+
+def build_config(app_target: ASGIApp | str = app) -> uvicorn.Config:
+    """
+    Build the Uvicorn configuration used to run the server.
+    
+    The configuration is only built when a server is about to run, because
+    creating a uvicorn.Config configures Uvicorn's loggers. Building it at import
+    would override the logging options of anyone who imports this module, such
+    as the uvicorn command line used by run_all.py.
+    
+    Settings:
+    - The app object is passed directly by default, so running this file with
+      python -m title_agent.server does not import the module a second time under
+      its package name (the Multiprocess fallback in main() passes an import string)
+    - loop='none' leaves the event loop to serve(), which creates one uvloop loop
+      (or a stdlib asyncio loop where uvloop is unavailable) for the process
+    - The httptools HTTP parser is used instead of the pure-Python h11 parser;
+      naming it explicitly makes startup fail if httptools is not installed
+    - WebSocket support is turned off because A2A streams responses over
+      Server-Sent Events on plain HTTP, never over WebSockets
+    - Access logging is disabled unless TITLE_AGENT_ACCESS_LOG is set
+    - lifespan='on' makes startup fail if the lifespan handler fails, rather than
+      serving requests without a Foundry agent; it must not be turned off, because
+      the lifespan handler creates the agent and closes its connections
+    - The Server header is left out; it only advertises the server software.
+      Uvicorn already formats the Date header once per second, not per response
+    
+    Args:
+        app_target (ASGIApp | str): The app, or an import string for it
+        
+    Returns:
+        uvicorn.Config: The server configuration
+    """
+    return uvicorn.Config(
+        app_target,
+        host=_BIND_HOST,
+        port=_PORT,
+        workers=workers,
+        loop='none',
+        http='httptools',
+        ws='none',
+        log_level='warning',
+        access_log=access_log,
+        lifespan='on',
+        backlog=LISTEN_BACKLOG,
+        server_header=False,
+    )
+
+# ============================================================================
+# Server Process
+# ============================================================================
+def serve(sockets: list[socket.socket] | None = None) -> None:
+    """
+    Run one Uvicorn server in the current process until it is shut down.
+    
+    The server is driven directly on a uvloop event loop (or a stdlib asyncio
+    loop where uvloop is unavailable) rather than through uvicorn.Server.run(),
+    so the loop is created once without changing the event loop policy.
+    
+    Args:
+        sockets (list[socket.socket] | None): Already-bound sockets to serve on;
+                                              if omitted, the server binds its own
+    """
+    server = uvicorn.Server(build_config())
+    if uvloop:
+        uvloop.run(server.serve(sockets=sockets))
+    else:
+        asyncio.run(server.serve(sockets=sockets))
+
+def create_listen_socket(reuse_port: bool = False) -> socket.socket:
+    """
+    Create the listening socket with options tuned for many small requests.
+    
+    Args:
+        reuse_port (bool): Set SO_REUSEPORT so several processes can bind the address
+        
+    Returns:
+        socket.socket: A bound socket that is listening with the configured backlog
+    """
+    sock = socket.create_server(
+        (_BIND_HOST, _PORT), family=_BIND_FAMILY, backlog=LISTEN_BACKLOG, reuse_port=reuse_port
+    )
+
+    # Disable Nagle's algorithm so small JSON responses are sent without delay
+    # Linux copies this to accepted connections; the event loop also sets it on each one
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    # Allow TCP Fast Open so returning clients can send their request in the SYN
+    # TCP_QUICKACK is not set because the kernel clears it again, so it cannot be
+    # configured once on the listener
+    # Fast Open is best-effort: some kernels and containers define the option but refuse it
+    if hasattr(socket, 'TCP_FASTOPEN'):
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_FASTOPEN, 256)
+        except OSError:
+            pass
+
+    return sock
+
+def serve_reuse_port() -> None:
+    """
+    Run one worker process on its own SO_REUSEPORT listening socket.
+    
+    Every worker binds the same address with SO_REUSEPORT, so the kernel keeps a
+    separate accept queue per worker and spreads new connections across them,
+    instead of all workers contending for one shared socket.
+    """
+    serve(sockets=[create_listen_socket(reuse_port=True)])
+
+def run_reuse_port_workers(count: int) -> None:
+    """
+    Start worker processes that each listen on their own SO_REUSEPORT socket.
+    
+    Blocks until the server is stopped, replacing any worker that exits so a
+    crashed worker does not permanently reduce capacity. Ctrl+C or SIGTERM
+    stops all workers gracefully. If a worker exits within
+    WORKER_MIN_UPTIME seconds of starting, it is failing at startup, so every
+    worker is stopped and the process exits with status 1 instead of
+    restarting it in a loop.
+    
+    Args:
+        count (int): The number of worker processes to start
+    """
+    # Each worker is tracked with the time it was started
+    processes = [_start_worker() for _ in range(count)]
+
+    # Treat SIGTERM like Ctrl+C so an orchestrator stopping this process stops the workers too
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        while True:
+            # Block until at least one worker exits
+            multiprocessing.connection.wait([process.sentinel for process, _ in processes])
+            for i, (process, started_at) in enumerate(processes):
+                if process.is_alive():
+                    continue
+                if time.monotonic() - started_at < WORKER_MIN_UPTIME:
+                    print(f'Title Agent: Worker {process.pid} failed at startup (exit code {process.exitcode})')
+                    raise SystemExit(1)
+                print(f'Title Agent: Worker {process.pid} exited (exit code {process.exitcode}), restarting it')
+                processes[i] = _start_worker()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # terminate() sends SIGTERM, which Uvicorn handles as a graceful shutdown
+        for process, _ in processes:
+            process.terminate()
+        for process, _ in processes:
+            process.join()
+
+def _start_worker() -> tuple[multiprocessing.Process, float]:
+    """
+    Start one SO_REUSEPORT worker process.
+    
+    Returns:
+        tuple[multiprocessing.Process, float]: The process and its monotonic start time
+    """
+    process = multiprocessing.Process(target=serve_reuse_port)
+    process.start()
+    return process, time.monotonic()
+
+def serve_granian() -> None:
+    """
+    Run the app with the Granian ASGI server instead of Uvicorn.
+    
+    Granian parses HTTP and manages connections and worker processes in Rust,
+    calling into Python only to run the app. It uses the same address, worker
+    count, event loop, backlog, and access log settings as the Uvicorn server.
+    
+    Raises:
+        ImportError: If Granian is not installed
+    """
+    # Imported here because Granian is an optional dependency
+    from granian import Granian
+    from granian.constants import Interfaces, Loops
+
+    Granian(
+        target='title_agent.server:app',
+        address=_BIND_HOST,
+        port=_PORT,
+        interface=Interfaces.ASGI,
+        workers=workers,
+        loop=Loops.uvloop if uvloop else Loops.asyncio,
+        backlog=LISTEN_BACKLOG,
+        log_access=access_log,
+    ).serve()
+
+def serve_hypercorn() -> None:
+    """
+    Run the app with the Hypercorn ASGI server instead of Uvicorn.
+    
+    Hypercorn serves HTTP/2 as well as HTTP/1.1, so an A2A client that supports
+    HTTP/2 can send many requests concurrently over one connection. Without TLS
+    this is cleartext HTTP/2 (h2c), which clients must request explicitly. It
+    uses the same address, worker count, event loop, backlog, and access log
+    settings as the Uvicorn server.
+    
+    Raises:
+        ImportError: If Hypercorn is not installed
+    """
+    # Imported here because Hypercorn is an optional dependency
+    from hypercorn.config import Config as HypercornConfig
+    from hypercorn.run import run as run_hypercorn
+
+    hypercorn_config = HypercornConfig()
+    hypercorn_config.application_path = 'title_agent.server:app'
+    # IPv6 addresses are written in brackets so the port can be told apart
+    bind_host = f'[{_BIND_HOST}]' if _BIND_FAMILY == socket.AF_INET6 else _BIND_HOST
+    hypercorn_config.bind = [f'{bind_host}:{_PORT}']
+    hypercorn_config.workers = workers
+    hypercorn_config.worker_class = 'uvloop' if uvloop else 'asyncio'
+    hypercorn_config.backlog = LISTEN_BACKLOG
+    hypercorn_config.accesslog = '-' if access_log else None
+    hypercorn_config.include_server_header = False
+    run_hypercorn(hypercorn_config)
 
 # ============================================================================
 # Main Entry Point
@@ -193,16 +545,51 @@ def main():
     The server runs on the host and port specified in environment variables:
     - SERVER_URL: The hostname or IP where the server listens
     - TITLE_AGENT_PORT: The port number for the server
+    - TITLE_AGENT_WORKERS: The number of worker processes (optional, default 1)
+    - TITLE_AGENT_ACCESS_LOG: Set to true to log every request (optional)
+    - TITLE_AGENT_CPU: A CPU to pin the server to when it runs one process (optional)
+    - TITLE_AGENT_SERVER: Set to granian or hypercorn to run on Granian or
+      Hypercorn instead of Uvicorn (optional)
     
-    Uvicorn is used as the ASGI server which provides:
+    Uvicorn is used as the ASGI server by default, which provides:
     - Async request handling
-    - HTTP/1.1 and HTTP/2 support
-    - WebSocket support
-    - Automatic worker management
+    - HTTP/1.1 support (use Hypercorn for HTTP/2)
+    - Multiple worker processes
+    
+    The server uses the uvloop event loop (where available) and the httptools
+    HTTP parser, and disables per-request access logging by default.
     """
-    # Run the server with uvicorn
-    # reload=False in production; set to True for development
-    uvicorn.run(app, host=host, port=port)
+    # Refuse unknown backends rather than silently falling back to Uvicorn
+    if server_backend not in SERVER_BACKENDS:
+        sys.exit(
+            f"Unknown TITLE_AGENT_SERVER '{server_backend}'; expected one of: {', '.join(SERVER_BACKENDS)}"
+        )
+
+    if server_backend == 'granian':
+        serve_granian()
+        return
+    if server_backend == 'hypercorn':
+        serve_hypercorn()
+        return
+
+    # Run the server with Uvicorn
+    if workers > 1 and sys.platform.startswith('linux'):
+        # Let the kernel balance connections across one listening socket per worker
+        # Only Linux spreads new connections across SO_REUSEPORT listeners; macOS and
+        # the BSDs define SO_REUSEPORT but send the connections to a single socket
+        run_reuse_port_workers(workers)
+    elif workers > 1:
+        # Elsewhere (e.g. on macOS or Windows) bind one socket in this process and
+        # share it with the worker processes
+        # Worker processes are spawned and receive a pickled copy of the config,
+        # so the app must be given as an import string that each worker imports
+        sock = create_listen_socket()
+        Multiprocess(build_config('title_agent.server:app'), target=serve, sockets=[sock]).run()
+    else:
+        # Pin the process to the configured CPU where the platform supports it
+        if cpu is not None and hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, {cpu})
+        serve(sockets=[create_listen_socket()])
 
 # ============================================================================
 # Application Startup